@@ -1,6 +1,8 @@
 
+import functools
 import logging
 import os
+import shutil
 import stat
 from ..tools import options
 from ..tools import dockerhandler
@@ -11,10 +13,19 @@ from ..tools.wrapper import Wrapper
 log = logging.getLogger('slurmy')
 
 
+class BackendCommandsMissing(Exception):
+    """@SLURMY
+    Exception raised when commands required by a backend are not available.
+    """
+    pass
+
+
 class Base(object):
     bid = bids['BASE']
     _script_options_identifier = ''
     _commands = []
+    ## Command sets that already passed validation in this process
+    _validated_command_sets = set()
     _successcode = '0:0'
     name = None
     log = None
@@ -26,7 +37,7 @@ class Base(object):
         ## If we are in docker_mode, start the docker container relevant for this backend
         if options.Main.docker_mode:
             dockerhandler.Main.start(self.bid)
-        self._check_commands()
+        self.ensure_commands()
 
     def __getitem__(self, key):
         return self.__dict__[key]
@@ -38,12 +49,7 @@ class Base(object):
         return (key in self.__dict__)
 
     def __repr__(self):
-        print_string = ''
-        for key, val in self.__dict__.items():
-            print_string += '{}: {}\n'.format(key, val)
-        print_string = print_string.rstrip('\n')
-
-        return print_string
+        return '\n'.join('{}: {}'.format(key, val) for key, val in self.__dict__.items())
 
     def sync(self, config):
         """@SLURMY
@@ -55,10 +61,14 @@ class Base(object):
         if not isinstance(config, self.__class__):
             log.error('({})Backend class "{}" does not match class "{}" of sync object'.format(self.name, self.__class__, config.__class__))
             return
-        for key in self.__dict__.keys():
-            if key.startswith('_'): continue
-            log.debug('({})Synchronising option "{}"'.format(self.name, key))
-            self[key] = self[key] or config[key]
+        src = self.__dict__
+        other = config.__dict__
+        ## Collect only the options that actually change, then apply them in one dict update
+        updates = {key: other[key] for key in src if not key.startswith('_') and not src[key] and other.get(key) is not None}
+        if log.isEnabledFor(logging.DEBUG):
+            for key in updates:
+                log.debug('({})Synchronising option "{}"'.format(self.name, key))
+        src.update(updates)
 
     def write_script(self, script_folder):
         """@SLURMY
@@ -67,40 +77,66 @@ class Base(object):
         * `script_folder` Folder to store the script file in.
         """
         out_file_name = os.path.join(script_folder, self.name)
-        ## If the provided run script is already existing, just copy it
-        if os.path.isfile(self.run_script):
-            os.system('cp {} {}'.format(self.run_script, out_file_name))
-            with open(out_file_name, 'r') as in_file:
-                self.run_script = in_file.read()
+        run_script = self.run_script
+        ## If the provided run script is an already existing file, read its content directly (no need to copy it first, it's written below anyway)
+        if os.path.isfile(run_script):
+            with open(run_script, 'r') as in_file:
+                run_script = in_file.read()
         ## Bash shebang required for slurm submission script, but probably fairly general (to be followed up after other backend implementations)
-        if not self.run_script.startswith('#!'):
-            self.run_script = '#!/bin/bash\n' + self.run_script
+        if not run_script.startswith('#!'):
+            run_script = '#!/bin/bash\n' + run_script
         ## Execute wrapper setup
-        self.run_script = self.wrapper.setup(self.run_script, self._script_options_identifier)
-        ## Write run script
-        with open(out_file_name, 'w') as out_file:
-            out_file.write(self.run_script)
+        run_script = self.wrapper.setup(run_script, self._script_options_identifier)
+        ## Write the fully assembled run script in one buffered write
+        with open(out_file_name, 'wb', buffering = 65536) as out_file:
+            out_file.write(run_script.encode())
         ## Set run script path
         self.run_script = out_file_name
         ## Set executable permissions
         os.chmod(self.run_script, stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH | stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
 
-    def _check_commands(self):
+    def _missing_commands(self):
+        """@SLURMY
+        Check which of the backend's commands are not available, without any user interaction.
+
+        Returns the list of missing commands ([str]).
+        """
+        ## If there are no commands to check or this command set was already validated, nothing to do
+        commands_key = frozenset(self._commands)
+        if not commands_key or commands_key in Base._validated_command_sets:
+            return []
+        ## If no command wrapper is configured for the backend, check all commands in a single PATH walk
+        if options.Main.command_wrapper[self.bid] == '{command}':
+            missing = Base._check_commands_bulk(commands_key)
+        else:
+            missing = set(command for command in self._commands if not Base._check_command(command, self.bid))
+        if not missing:
+            Base._validated_command_sets.add(commands_key)
+            return []
+
+        return [command for command in self._commands if command in missing]
+
+    def ensure_commands(self):
+        """@SLURMY
+        Ensure that the commands required by the backend are available. If commands are missing, either switch to test mode (automatically in interactive mode, otherwise on user confirmation) or raise BackendCommandsMissing.
+        """
         ## If we are in test mode, skip this sanity check
         if options.Main.test_mode:
             return
-        for command in self._commands:
-            if Base._check_command(command, self.bid): continue
+        missing = self._missing_commands()
+        if not missing:
+            return
+        for command in missing:
             log.error('{} command not found: "{}"'.format(self.bid, command))
-            ## If we are in interactive mode, switch into test/local mode. If in normal mode, prompt the user.
-            if options.Main.interactive_mode:
-                log.warning('Switching to test/local mode (batch submission will not work)!')
-                options.Main.test_mode = True
-                break
-            elif _prompt_decision('Switch to test mode (batch submission will not work)?'):
-                options.Main.test_mode = True
-                break
-            raise Exception
+        ## If we are in interactive mode, switch into test/local mode. If in normal mode, prompt the user.
+        if options.Main.interactive_mode:
+            log.warning('Switching to test/local mode (batch submission will not work)!')
+            options.Main.test_mode = True
+            return
+        if _prompt_decision('Switch to test mode (batch submission will not work)?'):
+            options.Main.test_mode = True
+            return
+        raise BackendCommandsMissing('{} commands missing: {}'.format(self.bid, ', '.join(missing)))
 
     @staticmethod
     def _get_command(command, bid):
@@ -109,13 +145,41 @@ class Base(object):
         return full_command
 
     @staticmethod
+    @functools.lru_cache(maxsize = None)
+    def _check_commands_bulk(commands):
+        ## Test all commands against each PATH entry in one walk, without spawning any process
+        missing = set(commands)
+        for folder in os.get_exec_path():
+            for command in list(missing):
+                if os.access(os.path.join(folder, command), os.X_OK):
+                    missing.discard(command)
+            if not missing: break
+
+        return frozenset(missing)
+
+    @staticmethod
+    @functools.lru_cache(maxsize = None)
     def _check_command(command, bid):
+        ## If no command wrapper is configured for the backend, do a pure in-process PATH lookup instead of spawning a "which" process
+        if options.Main.command_wrapper[bid] == '{command}':
+            return shutil.which(command) is not None
         command = 'which {}'.format(command)
         ## Wrap command
         command = Base._get_command(command, bid)
 
         return check_return(command)
 
+    @staticmethod
+    def get_statuses(job_ids):
+        """@SLURMY
+        Get the status of multiple jobs with a single aggregated backend query. Returns None if the backend doesn't support aggregated queries, in which case jobs are polled individually.
+
+        * `job_ids` List of job ids to poll.
+
+        Returns dict mapping job id to (Status, exitcode), or None (dict or None).
+        """
+        return None
+
     ## Backend specific implementations
     def submit(self):
         return 0
@@ -168,6 +168,31 @@ class Slurm(Base):
 
         return sacct_command
 
+    @staticmethod
+    def get_statuses(job_ids):
+        """@SLURMY
+        Get the status of multiple slurm jobs with a single aggregated sacct call.
+
+        * `job_ids` List of job ids to poll.
+
+        Returns dict mapping job id to (Status, exitcode) (dict).
+        """
+        sacct_command = Slurm._get_sacct_command('JobID,State,ExitCode', job_id = ','.join(str(job_id) for job_id in job_ids))
+        sacct_output = subprocess.check_output(sacct_command, universal_newlines = True).rstrip('\n').split('\n')
+        log.debug('Return list from aggregated sacct: {}'.format(sacct_output))
+        statuses = {}
+        for entry in sacct_output[1:]:
+            job_id, state, exitcode = entry.split('|')
+            ## Skip the .batch entries if any exist
+            if '.batch' in job_id: continue
+            job_id = int(job_id)
+            if state in Slurm._run_states:
+                statuses[job_id] = (Status.RUNNING, None)
+            else:
+                statuses[job_id] = (Status.FINISHED, exitcode)
+
+        return statuses
+
     @staticmethod
     def get_listen_func(partition = None, clusters = None):
         user = options.Main.user
@@ -583,6 +583,39 @@ class JobHandler(object):
         if print_summary:
             self._printer.print_summary()
 
+    def snapshot(self):
+        """@SLURMY
+        Update the status of in-flight batch jobs with one aggregated backend query per backend, instead of one query per job. Jobs whose backend doesn't support aggregated queries are left untouched and evaluate their status individually, as before.
+        """
+        ## Collect the RUNNING batch jobs which would each query their backend status individually
+        poll_jobs = {}
+        for name in self.jobs._states[Status.RUNNING]:
+            job = self.jobs[name]
+            if job.type == Type.LOCAL: continue
+            ## PASSIVE jobs are updated by a Listener
+            if job.mode == Mode.PASSIVE: continue
+            ## Jobs with a custom finished_func don't query the backend
+            if job.config.finished_func is not None: continue
+            if job.id is None: continue
+            bid = job.config.backend.bid
+            if bid not in poll_jobs: poll_jobs[bid] = []
+            poll_jobs[bid].append(job)
+        ## Issue one aggregated status query per backend and update the jobs which finished
+        for bid, jobs in poll_jobs.items():
+            statuses = get_backend_class(bid).get_statuses([job.id for job in jobs])
+            ## If the backend doesn't support aggregated queries, do nothing
+            if statuses is None: continue
+            for job in jobs:
+                result = statuses.get(job.id)
+                if result is None: continue
+                status, exitcode = result
+                if status != Status.FINISHED: continue
+                log.debug('Aggregated status query found job "{}" to be FINISHED'.format(job.name))
+                job.status = Status.FINISHED
+                job.exitcode = exitcode
+                ## Run the success evaluation and update the job bookkeeping with the new status
+                self._check_job(job)
+
     def _check_job(self, job, force_success_check = False, skip_eval = False):
         ## Update job status
         self.jobs._update_job_status(job, force_success_check = force_success_check, skip_eval = skip_eval)
@@ -13,11 +13,11 @@ log = logging.getLogger('slurmy')
 
 
 class Options(object):
-    _options_file = '{}/.slurmy'.format(os.environ['HOME'])
+    _options_file = os.path.join(os.environ['HOME'], '.slurmy')
 
     def __init__(self):
         ## General options. Set defaults here, which are overwritten by values set in _options_file.
-        self.bookkeeping = '{}/.slurmy_bookkeeping'.format(os.environ['HOME'])
+        self.bookkeeping = os.path.join(os.environ['HOME'], '.slurmy_bookkeeping')
         self.workdir = './'
         self.backend = None
         self.editor = None
@@ -8,6 +8,13 @@ from .tags import Tags
 
 log = logging.getLogger('slurmy')
 
+## Status/type members bound at module level, to avoid repeated enum attribute lookups in the update hot paths
+_RUNNING = Status.RUNNING
+_SUCCESS = Status.SUCCESS
+_FAILED = Status.FAILED
+_CANCELLED = Status.CANCELLED
+_LOCAL = Type.LOCAL
+
 
 class Printer(object):
     """@SLURMY
@@ -34,6 +41,20 @@ class Printer(object):
                 log.warning('Please install tqdm to use the bar mode')
                 self._bar_mode = False
         self._bar_format = '{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{postfix}]'
+        ## Precompiled print string templates for the simple printing mode
+        self._simple_template = 'Jobs (success/fail/all): ({}/{}/{})'
+        self._simple_template_verbose = 'Jobs running (batch/local/all): ({}/{}/{}); (success/fail/all): ({}/{}/{})'
+        ## Last line written in simple printing mode
+        self._last_line = None
+        ## Minimum and maximum wall-clock interval between printer updates (in seconds)
+        self._min_interval = 0.1
+        self._max_interval = 5.0
+        ## Current update interval, adapted to the job completion rate
+        self._interval = self._min_interval
+        ## Time of the last printer update
+        self._last_update = 0.0
+        ## Number of completed jobs seen at the last update
+        self._last_n_complete = 0
         ## Time
         self._time = None
         ## Tags which are tracked (set during bars setup)
@@ -47,12 +68,16 @@ class Printer(object):
 
     def _setup_bars(self):
         from tqdm import tqdm
+        ## Options shared by all bars and a snapshot of the tag bookkeeping for the setup loop
+        ## Bar redraws are throttled to the printer update interval, the explicit refresh in _update_bars does the rendering
+        bar_kwargs = {'unit': 'job', 'mininterval': self._min_interval, 'miniters': 1}
+        tags_map = self._parent.jobs._tags
         ## Recursive function to add tags
         def add(tags, prefix = '-'):
             for tag in tags:
-                n_jobs_tag = len(self._parent.jobs._tags[tag])
+                n_jobs_tag = len(tags_map[tag])
                 n_initial_tag = sum(updates[tag].values())
-                bars[tag] = tqdm(total = n_jobs_tag, initial = n_initial_tag, desc = tag, unit = 'job', bar_format = prefix+self._bar_format)
+                bars[tag] = tqdm(total = n_jobs_tag, initial = n_initial_tag, desc = tag, bar_format = prefix+self._bar_format, **bar_kwargs)
                 bars[tag].set_postfix(updates[tag])
                 add(tags[tag], prefix+'-')
         ## Get updates for the initial bar values
@@ -63,42 +88,66 @@ class Printer(object):
         n_jobs = len(self._parent.jobs)
         #### Initial number of success/failed jobs
         n_initial = sum(updates['all'].values())
-        bars['all'] = tqdm(total = n_jobs, initial = n_initial, desc = 'all', unit = 'job', bar_format = self._bar_format)
+        bars['all'] = tqdm(total = n_jobs, initial = n_initial, desc = 'all', bar_format = self._bar_format, **bar_kwargs)
         bars['all'].set_postfix(updates['all'])
         add(self._tags.tree)
+        ## Remember the initial counts per bar, so that no-op ticks can be skipped in the update
+        self._last_counts = {tag: tuple(updates[tag].values()) for tag in updates}
 
         return bars
 
     def _get_updates(self):
-        update_dict = OrderedDict()        
+        status_labels = {_SUCCESS: 'S', _FAILED: 'F', _CANCELLED: 'C'}
+        update_dict = OrderedDict()
         ## Entry for all jobs
-        update_dict['all'] = OrderedDict()
-        for status_label, status in zip(['S', 'F', 'C'], [Status.SUCCESS, Status.FAILED, Status.CANCELLED]):
-            update_dict['all'][status_label] = len(self._parent.jobs._states[status])
+        update_dict['all'] = OrderedDict([('S', 0), ('F', 0), ('C', 0)])
         ## Entries for tracked tags
         for tag in self._tags.tags:
-            update_dict[tag] = OrderedDict()
-            for status_label, status in zip(['S', 'F', 'C'], [Status.SUCCESS, Status.FAILED, Status.CANCELLED]):
-                update_dict[tag][status_label] = len(self._parent.jobs.get(tags = tag, states = status))
+            update_dict[tag] = OrderedDict([('S', 0), ('F', 0), ('C', 0)])
+        ## Single pass over the jobs, incrementing the counters of all matching tags
+        ## Skip the per-job status evaluation, the stored states are kept up to date by the JobHandler
+        for job in self._parent.jobs.values():
+            status = job.get_status(skip_eval = True)
+            if status not in status_labels: continue
+            status_label = status_labels[status]
+            update_dict['all'][status_label] += 1
+            for tag in job.tags:
+                if tag not in update_dict: continue
+                update_dict[tag][status_label] += 1
 
         return update_dict
 
     def _update_bars(self):
+        from tqdm import tqdm
         ## Get updates
         updates = self._get_updates()
-        ## Update bars
-        for tag in updates:
-            n_jobs = sum(updates[tag].values())
-            n_update_jobs = n_jobs - self._bars[tag].n
-            if n_update_jobs > 0:
-                ## If update number is positive, just update the bar
-                self._bars[tag].update(n_update_jobs)
-            elif n_update_jobs < 0:
-                ## Else if it's negative, set bar.n to n_jobs
-                self._bars[tag].n = n_jobs
-            ### Set postfix to number of success/failed/cancelled jobs
-            ### This also forces a refresh
-            self._bars[tag].set_postfix(updates[tag])
+        ## Update bars, skipping the ones whose counts didn't change since the last tick
+        ## The tqdm write lock is held once for all bar updates and redraws
+        changed_bars = []
+        lock = tqdm.get_lock()
+        lock.acquire()
+        try:
+            for tag in updates:
+                counts = tuple(updates[tag].values())
+                if counts == self._last_counts.get(tag): continue
+                self._last_counts[tag] = counts
+                bar = self._bars[tag]
+                n_jobs = sum(counts)
+                n_update_jobs = n_jobs - bar.n
+                if n_update_jobs > 0:
+                    ## If update number is positive, just update the bar
+                    bar.update(n_update_jobs)
+                elif n_update_jobs < 0:
+                    ## Else if it's negative, set bar.n to n_jobs
+                    bar.n = n_jobs
+                ### Set postfix to number of success/failed/cancelled jobs, deferring the redraw
+                bar.set_postfix(updates[tag], refresh = False)
+                changed_bars.append(bar)
+            ## Redraw each changed bar exactly once, without re-acquiring the lock
+            for bar in changed_bars:
+                bar.refresh(nolock = True)
+        finally:
+            lock.release()
 
     def start(self):
         """@SLURMY
@@ -115,12 +164,28 @@ class Printer(object):
         else:
             self._print_simple()
 
-    def update(self):
+    def update(self, force = False):
         """@SLURMY
         Update printer output.
+
+        * `force` Force the update, ignoring the update interval throttling.
         """
         ## If verbosity is 0, do nothing
         if self._verbosity == 0: return
+        ## Throttle the update frequency, so that tight polling loops don't spend their time redrawing the output
+        now = time.monotonic()
+        if not force and (now - self._last_update) < self._interval: return
+        self._last_update = now
+        ## Refresh the job state bookkeeping with one aggregated backend query, the output below is computed purely from the bookkeeping
+        self._parent.snapshot()
+        ## Adapt the update interval to the job completion rate: back off while nothing happens, speed up again during completion bursts
+        states = self._parent.jobs._states
+        n_complete = len(states[_SUCCESS]) + len(states[_FAILED]) + len(states[_CANCELLED])
+        if n_complete == self._last_n_complete:
+            self._interval = min(self._interval * 1.5, self._max_interval)
+        else:
+            self._interval = max(self._interval / 2, self._min_interval)
+        self._last_n_complete = n_complete
         if self._bar_mode:
             self._update_bars()
         else:
@@ -131,7 +196,7 @@ class Printer(object):
         Stop printer.
         """
         ## Final update before we stop
-        self.update()
+        self.update(force = True)
         self._time = time.time() - self._time
         ## If verbosity is 0, stop here
         if self._verbosity == 0: return
@@ -151,45 +216,46 @@ class Printer(object):
         print_string = self._get_print_string()
         if self._manual_mode:
             print_string += ' - press enter to update status'
-        stdout.write('\r'+print_string)
+        print_string = '\r' + print_string
+        ## Skip write and flush entirely if the output didn't change since the last update
+        if print_string == self._last_line: return
+        self._last_line = print_string
+        ## Write the line, carriage return included, in a single call
+        stdout.write(print_string)
         stdout.flush()
 
     def _get_print_string(self):
-        print_string = 'Jobs '
+        n_success = len(self._parent.jobs._states[_SUCCESS])
+        n_failed = len(self._parent.jobs._states[_FAILED])
+        n_all = len(self._parent.jobs)
         if self._verbosity > 1:
-            n_running = len(self._parent.jobs._states[Status.RUNNING])
+            n_running = len(self._parent.jobs._states[_RUNNING])
             n_local = len(self._parent.jobs._local)
             n_batch = n_running - n_local
-            print_string += 'running (batch/local/all): ({}/{}/{}); '.format(n_batch, n_local, n_running)
-        n_success = len(self._parent.jobs._states[Status.SUCCESS])
-        n_failed = len(self._parent.jobs._states[Status.FAILED])
-        n_all = len(self._parent.jobs)
-        print_string += '(success/fail/all): ({}/{}/{})'.format(n_success, n_failed, n_all)
+            return self._simple_template_verbose.format(n_batch, n_local, n_running, n_success, n_failed, n_all)
 
-        return print_string
+        return self._simple_template.format(n_success, n_failed, n_all)
 
     def _get_summary_string(self, time_spent = None):
-        n_jobs = len(self._parent.jobs)
-        n_local = len(self._parent.jobs._tags[Type.LOCAL])
-        n_batch = n_jobs - n_local
         summary_dict = OrderedDict()
-        summary_dict['all'] = {'string': 'Jobs processed ', 'batch': n_batch, 'local': n_local}
+        summary_dict['all'] = {'string': 'Jobs processed ', 'batch': 0, 'local': 0}
         summary_dict['success'] = {'string': '     successful ', 'batch': 0, 'local': 0}
         summary_dict['fail'] = {'string': '     failed ', 'batch': 0, 'local': 0}
-        jobs_failed = ''
+        failed_names = []
+        ## Single pass over the jobs, counting job types and final states in one go
         for job in self._parent.jobs.values():
             status = job.get_status()
-            if status == Status.SUCCESS:
-                if job.type == Type.LOCAL:
-                    summary_dict['success']['local'] += 1
-                else:
-                    summary_dict['success']['batch'] += 1
-            elif status == Status.FAILED or status == Status.CANCELLED:
-                jobs_failed += '{} '.format(job.name)
-                if job.type == Type.LOCAL:
-                    summary_dict['fail']['local'] += 1
-                else:
-                    summary_dict['fail']['batch'] += 1
+            if job.type == _LOCAL:
+                job_kind = 'local'
+            else:
+                job_kind = 'batch'
+            summary_dict['all'][job_kind] += 1
+            if status == _SUCCESS:
+                summary_dict['success'][job_kind] += 1
+            elif status == _FAILED or status == _CANCELLED:
+                failed_names.append(job.name)
+                summary_dict['fail'][job_kind] += 1
+        jobs_failed = ' '.join(failed_names)
 
         print_string = ''
         for key, summary_val in summary_dict.items():
@@ -210,5 +276,4 @@ class Printer(object):
         Print a summary of the job processing.
         """
         print_string = self._get_summary_string(self._time)
-        stdout.write('\r'+print_string)
-        stdout.write('\n')
+        stdout.write('\r' + print_string + '\n')
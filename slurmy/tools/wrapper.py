@@ -15,22 +15,31 @@ class Wrapper(object):
         ## Define command
         command = self._command.format(args = self._wrap_args)
         command = self._condition.format(command = command)
-        ## Recursive function to scan script and find proper position for the command
-        def add_command(tail, head = ''):
-            line, tail = tail.split('\n', 1)
+        ## Single forward pass over the script lines to find the proper position for the command
+        lines = run_script.split('\n')
+        ## Find the index of the last line carrying the backend options identifier, the command must be inserted after it
+        last_options_index = -1
+        if script_options_identifier:
+            identifier = '#{}'.format(script_options_identifier)
+            for index, line in enumerate(lines):
+                if identifier in line:
+                    last_options_index = index
+        ## Walk the lines and find the insertion index: before the first line with actual payload, or directly after the options block
+        insert_index = len(lines)
+        for index, line in enumerate(lines):
             line = line.strip()
             ## When line is not empty and is not commented out, command must be inserted before here in any case
             if line and not line.startswith('#'):
-                return head + command + '{}\n'.format(line) + tail
-            ## If tail doesn't contain the backend options identifier, command can be inserted here
-            elif script_options_identifier and '#{}'.format(script_options_identifier) not in tail:
-                return head + '{}\n'.format(line) + command + tail
-            else:
-                head += '{}\n'.format(line)
-                return add_command(tail, head)
+                insert_index = index
+                break
+            ## If no backend options identifier follows, command can be inserted here
+            if script_options_identifier and index >= last_options_index:
+                insert_index = index + 1
+                break
         ## Add the command
-        run_script = add_command(run_script)
-        
+        head = ''.join('{}\n'.format(line) for line in lines[:insert_index])
+        run_script = head + command + '\n'.join(lines[insert_index:])
+
         return run_script
 
     def _create_wrap_script(self):